@@ -1,16 +1,32 @@
 import re
 
+_TIME_RE = re.compile(r'(\d{1,2}:\d{2})$')
+
+def _strip_leading_num(text):
+    """
+    Strips a leading track number such as '7. ' from a title.
+    """
+    i = 0
+    n = len(text)
+    while i < n and text[i].isdigit():
+        i += 1
+    if i == 0 or i == n or text[i] != '.':
+        return text
+    i += 1
+    while i < n and text[i].isspace():
+        i += 1
+    return text[i:]
+
 def parse_raw_tracklist_data(raw_data):
     """
     Parses raw text data to extract a list of tracks with titles and durations
     using a more robust, line-by-line heuristic approach.
     """
     tracks = []
-    time_pattern = re.compile(r'(\d{1,2}:\d{2})$')
     
     for line in raw_data.strip().split('\n'):
         line = line.strip()
-        time_match = time_pattern.search(line)
+        time_match = _TIME_RE.search(line)
         
         if not time_match:
             continue
@@ -18,7 +34,7 @@ def parse_raw_tracklist_data(raw_data):
         duration = time_match.group(1)
         title_part = line[:time_match.start()].strip()
         
-        title_part = re.sub(r'^\d+\.\s*', '', title_part)
+        title_part = _strip_leading_num(title_part)
         title_part = title_part.rstrip(' -–')
         title_part = title_part.strip('"')
         
@@ -1,7 +1,16 @@
+import collections
 import subprocess
 import re
 import argparse
 
+# Regex to find silence start and end
+# [silencedetect @ 0x...] lavfi.c:204] silence_start: 1.23
+# [silencedetect @ 0x...] lavfi.c:204] silence_end: 4.56 | silence_duration: 3.33
+_SILENCE_EVENT = re.compile(rb"silence_(start|end):\s*(\d+\.?\d*)")
+# ffmpeg prints the input duration when it opens the stream:
+#   Duration: 00:41:23.45, start: 0.025057, bitrate: 320 kb/s
+_DURATION = re.compile(rb"Duration:\s*(\d+):(\d+):(\d+\.\d+)")
+
 def detect_silence_intervals(audio_path, min_silence_len=1.0, silence_thresh=-40.0):
     """
     Detects silence intervals in an audio file using ffmpeg's silencedetect filter.
@@ -12,43 +21,56 @@ def detect_silence_intervals(audio_path, min_silence_len=1.0, silence_thresh=-40
         silence_thresh (float): The dBFS value below which audio is considered silent.
 
     Returns:
-        list: A list of (start_ms, end_ms) tuples representing silence intervals.
+        tuple: A list of (start_ms, end_ms) tuples representing silence intervals,
+            and the duration of the audio in milliseconds (None if ffmpeg did not report it).
     """
     command = [
         "ffmpeg",
+        "-nostats",
         "-i", audio_path,
+        # Only the audio is analysed; skip decoding embedded cover art and other streams
+        "-vn", "-sn", "-dn",
         "-af", f"silencedetect=noise={silence_thresh}dB:d={min_silence_len}",
         "-f", "null",
         "-"
     ]
 
     print(f"Running ffmpeg for silence detection: {' '.join(command)}")
-    process = subprocess.run(command, capture_output=True, text=True, encoding='utf-8', errors='replace')
-    
-    if process.returncode != 0:
-        print(f"ffmpeg command failed with error:\n{process.stderr}")
-        return []
-
-    silence_intervals = []
-    # Regex to find silence start and end
-    # [silencedetect @ 0x...] lavfi.c:204] silence_start: 1.23
-    # [silencedetect @ 0x...] lavfi.c:204] silence_end: 4.56 | silence_duration: 3.33
-    
-    silence_start_pattern = re.compile(r"silence_start: (\d+\.?\d*)")
-    silence_end_pattern = re.compile(r"silence_end: (\d+\.?\d*)")
+    # Parse stderr as ffmpeg writes it rather than buffering the whole log;
+    # only the tail is kept around for the error message. The markers we look
+    # for are plain ASCII, so lines are matched as bytes and never decoded.
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
 
+    duration_ms = None
     starts = []
     ends = []
+    stderr_tail = collections.deque(maxlen=50)
+
+    for line in process.stderr:
+        stderr_tail.append(line)
+
+        if b'silence_' in line:
+            match = _SILENCE_EVENT.search(line)
+            if match:
+                if match.group(1) == b'start':
+                    starts.append(float(match.group(2)))
+                else:
+                    ends.append(float(match.group(2)))
+        elif duration_ms is None:
+            # The same ffmpeg run reports the duration, so no separate ffprobe call is needed.
+            duration_match = _DURATION.search(line)
+            if duration_match:
+                hours, minutes, seconds = duration_match.groups()
+                duration_ms = int((int(hours) * 3600 + int(minutes) * 60 + float(seconds)) * 1000)
+
+    process.stderr.close()
+    if process.wait() != 0:
+        stderr_text = b''.join(stderr_tail).decode('utf-8', errors='replace')
+        print(f"ffmpeg command failed with error:\n{stderr_text}")
+        return [], None
+
+    silence_intervals = []
 
-    for line in process.stderr.splitlines():
-        start_match = silence_start_pattern.search(line)
-        end_match = silence_end_pattern.search(line)
-        
-        if start_match:
-            starts.append(float(start_match.group(1)))
-        elif end_match:
-            ends.append(float(end_match.group(1)))
-            
     # Combine starts and ends into intervals
     # If a track starts with silence, or ends with silence, we might get an unmatched start/end.
     # For splitting tracks, we're mostly interested in silence *between* tracks.
@@ -63,7 +85,7 @@ def detect_silence_intervals(audio_path, min_silence_len=1.0, silence_thresh=-40
         else: # Unmatched end, perhaps silence from start of file was detected
             j += 1
             
-    return silence_intervals
+    return silence_intervals, duration_ms
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Detect silence intervals in an audio file using ffmpeg.")
@@ -75,7 +97,10 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
-    intervals = detect_silence_intervals(args.audio_file, args.min_silence_len, args.silence_thresh)
+    intervals, duration_ms = detect_silence_intervals(args.audio_file, args.min_silence_len, args.silence_thresh)
+
+    if duration_ms is not None:
+        print(f"\nAudio duration: {duration_ms}ms")
 
     if intervals:
         print("\nDetected silence intervals (start_ms, end_ms):")
@@ -1,9 +1,78 @@
 import argparse
+import hashlib
 import json
+import tempfile
+import urllib.parse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import sys
 import os
 
+# orjson is an optional, faster drop-in for the album_data.json file. orjson only
+# supports a 2-space indent, so the fallback matches it byte for byte and the
+# hand-editable file looks the same either way.
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+# A single session reuses the HTTPS connection to musicbrainz.org between the
+# search and the follow-up details request, and retries when rate-limited.
+SESSION = requests.Session()
+SESSION.headers.update({
+    'User-Agent': 'RecordRecordingSplitter/1.0 ( gemini-cli@example.com )'
+})
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 503])
+))
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "record-splitter")
+
+def _cached_get(url, use_cache=True):
+    """
+    Fetches a MusicBrainz URL and returns the decoded JSON, memoized on disk.
+    Raises requests.exceptions.RequestException on a network or HTTP error.
+    """
+    key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    cache_path = os.path.join(CACHE_DIR, f"{key}.json")
+
+    if use_cache and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r') as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            pass  # Unreadable cache entry; fetch it again.
+
+    response = SESSION.get(url, timeout=10)
+    response.raise_for_status()
+    data = response.json()
+
+    # A search with no releases may be a transient miss, so it isn't worth memoizing.
+    if isinstance(data, dict) and data.get('releases') == []:
+        return data
+
+    # Write to a temporary file and rename, so a crash never leaves a partial entry.
+    tmp_path = None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: Could not write MusicBrainz cache entry: {e}", file=sys.stderr)
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return data
+
 def parse_artist_album_from_filename(filepath):
     """
     Parses artist and album from a filename like 'artist - album.mp3'.
@@ -23,19 +92,21 @@ def parse_artist_album_from_filename(filepath):
         print(f"Error parsing filename: {e}")
         return None, None
 
-def search_release(artist, album):
+def search_release(artist, album, use_cache=True):
     """
     Searches for a release on MusicBrainz.
     """
-    headers = {
-        'User-Agent': 'RecordRecordingSplitter/1.0 ( gemini-cli@example.com )'
-    }
-    search_url = f"https://musicbrainz.org/ws/2/release/?query=artist:{artist} AND release:{album} AND primarytype:album&fmt=json"
+    # inc=recordings asks for track listings inline, which can save the follow-up details request
+    query = urllib.parse.urlencode({
+        'query': f"artist:{artist} AND release:{album} AND primarytype:album",
+        'fmt': 'json',
+        'limit': 10,
+        'inc': 'recordings'
+    })
+    search_url = f"https://musicbrainz.org/ws/2/release/?{query}"
     
     try:
-        response = requests.get(search_url, headers=headers)
-        response.raise_for_status()
-        data = response.json()
+        data = _cached_get(search_url, use_cache)
         
         if data['releases']:
             return data['releases']
@@ -46,20 +117,15 @@ def search_release(artist, album):
         print(f"Error searching for release: {e}", file=sys.stderr)
         return None
 
-def get_release_details(release_id):
+def get_release_details(release_id, use_cache=True):
     """
     Gets detailed information for a specific release, including track listing.
     """
-    headers = {
-        'User-Agent': 'RecordRecordingSplitter/1.0 ( gemini-cli@example.com )'
-    }
     # inc=recordings is crucial to get track details
     details_url = f"https://musicbrainz.org/ws/2/release/{release_id}?inc=recordings&fmt=json"
 
     try:
-        response = requests.get(details_url, headers=headers)
-        response.raise_for_status()
-        return response.json()
+        return _cached_get(details_url, use_cache)
 
     except requests.exceptions.RequestException as e:
         print(f"Error getting release details: {e}", file=sys.stderr)
@@ -74,7 +140,7 @@ def format_duration(milliseconds):
     seconds %= 60
     return f"{minutes}:{seconds:02}"
 
-def main(input_file):
+def main(input_file, use_cache=True, return_data=False):
     artist, album = parse_artist_album_from_filename(input_file)
     if not artist or not album:
         sys.exit(1)
@@ -85,26 +151,23 @@ def main(input_file):
         os.makedirs(output_dir)
 
     print(f"Searching for '{album}' by '{artist}'...")
-    release_list = search_release(artist, album)
+    release_list = search_release(artist, album, use_cache)
 
     if not release_list:
         print("Could not find a matching release on MusicBrainz.", file=sys.stderr)
         sys.exit(1)
 
-    # Find the first release that doesn't have "live" in the title
-    release = None
-    for r in release_list:
-        if 'live' not in r['title'].lower():
-            release = r
-            break
-    
-    # If no non-live release is found, fall back to the first one
-    if not release:
-        release = release_list[0]
+    # Find the first release that doesn't have "live" in the title,
+    # falling back to the first one if every release is live
+    release = next((r for r in release_list if 'live' not in r['title'].lower()), release_list[0])
 
     print(f"Selected release: {release['title']} ({release['id']})")
     
-    release_details = get_release_details(release['id'])
+    # Only ask for the details when the search result didn't already include the tracks
+    if release.get('media') and release['media'][0].get('tracks'):
+        release_details = release
+    else:
+        release_details = get_release_details(release['id'], use_cache)
     
     if not release_details:
         print("Could not retrieve release details.", file=sys.stderr)
@@ -114,10 +177,11 @@ def main(input_file):
     # A more complex script might handle multi-disc albums.
     tracks_data = release_details['media'][0]['tracks']
 
+    tracks_out = []
     album_struct = {
         release['title'].lower(): {
             "artist": release['artist-credit'][0]['name'].lower(),
-            "tracks": [],
+            "tracks": tracks_out,
             # A default assumption. The user might need to adjust this.
             "side_a_tracks": len(tracks_data) // 2
         }
@@ -130,7 +194,7 @@ def main(input_file):
         duration_ms = track.get('length') 
         duration_str = format_duration(duration_ms)
         
-        album_struct[release['title'].lower()]['tracks'].append({
+        tracks_out.append({
             "title": title,
             "duration": duration_str
         })
@@ -140,8 +204,8 @@ def main(input_file):
     # Write to the output file
     output_path = os.path.join(output_dir, "album_data.json")
     try:
-        with open(output_path, 'w') as f:
-            json.dump(album_struct, f, indent=4)
+        with open(output_path, 'wb') as f:
+            f.write(_dumps(album_struct))
         print(f"\nSuccessfully created '{output_path}'.")
         print("NOTE: The 'side_a_tracks' value is an estimate. Please verify and adjust it if necessary.")
 
@@ -149,9 +213,14 @@ def main(input_file):
         print(f"Error writing to file: {e}", file=sys.stderr)
         sys.exit(1)
 
+    if return_data:
+        return album_struct
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Fetch album data from MusicBrainz and create album_data.json in a new folder.")
     parser.add_argument("input_file", type=str, help="The input audio file (e.g., 'artist - album.mp3').")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore cached MusicBrainz responses and fetch fresh data.")
     
     args = parser.parse_args()
-    main(args.input_file)
+    main(args.input_file, use_cache=not args.no_cache)
@@ -1,4 +1,5 @@
 import argparse
+import logging
 import sys
 
 try:
@@ -17,13 +18,19 @@ def main():
                         help="Minimum length in seconds of a silence to be considered (default: 1.0s).")
     parser.add_argument("--silence_thresh", type=float, default=-40.0,
                         help="The dBFS value below which audio is considered silent (default: -40.0 dBFS).")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore cached MusicBrainz responses and fetch fresh data.")
     
     args = parser.parse_args()
 
+    # Show split_audio's progress messages alongside the other scripts' output
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
+
     # --- Step 1: Fetch Album Data ---
     print("--- Step 1: Fetching Album Data ---")
+    album_data = None
     try:
-        fetch_main(args.input_audio)
+        album_data = fetch_main(args.input_audio, use_cache=not args.no_cache, return_data=True)
         print("--- Album data fetched successfully. ---\n")
     except SystemExit as e:
         if e.code != 0:
@@ -34,7 +41,8 @@ def main():
     print("--- Step 2: Splitting Audio ---")
     try:
         # The splitter's main function takes output_dir as None by default
-        split_main(args.input_audio, None, args.min_silence_len, args.silence_thresh)
+        split_main(args.input_audio, None, args.min_silence_len, args.silence_thresh,
+                   preloaded_album_data=album_data)
         print("--- Audio splitting complete. ---")
     except SystemExit as e:
         if e.code != 0:
@@ -1,32 +1,25 @@
 import argparse
+import itertools
+import logging
 import os
-import subprocess
-import json
+import re
+import sys
 from datetime import timedelta
 
+# orjson is an optional, faster drop-in for reading album_data.json.
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
 # Assuming detect_silence.py and split_audio.py are in the same directory
 from detect_silence import detect_silence_intervals
-from split_audio import split_audio_segment
+from split_audio import split_audio_segments
 
-def get_audio_duration(audio_path):
-    """
-    Gets the duration of an audio file in milliseconds using ffmpeg.
-    """
-    command = [
-        "ffprobe",
-        "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1",
-        audio_path
-    ]
-    
-    try:
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        duration_seconds = float(result.stdout.strip())
-        return int(duration_seconds * 1000)
-    except Exception as e:
-        print(f"Error getting audio duration for {audio_path}: {e}")
-        return None
+# Track filenames keep only spaces and characters for which str.isalnum() is True:
+# letters, digits and other numeric characters such as '½' or 'Ⅻ'. Everything
+# else, including '_', is dropped.
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^\w ]|_')
 
 def parse_artist_album_from_filename(filepath):
     """
@@ -50,27 +43,53 @@ def parse_artist_album_from_filename(filepath):
 def find_side_break(silence_intervals):
     """
     Finds the longest silence interval, assumed to be the side break.
+    Returns a tuple: (side_break, side_a_silences, side_b_silences)
     """
     if not silence_intervals:
-        return None
-    
-    longest_silence = max(silence_intervals, key=lambda i: i[1] - i[0])
-    return longest_silence
+        return None, [], []
+
+    longest_index = 0
+    longest_duration = -1
+    for i, (start, end) in enumerate(silence_intervals):
+        if end - start > longest_duration:
+            longest_index = i
+            longest_duration = end - start
+
+    # Silences are in time order, so everything before the break is Side A and everything after is Side B
+    side_break = silence_intervals[longest_index]
+    return side_break, silence_intervals[:longest_index], silence_intervals[longest_index + 1:]
 
 def duration_to_ms(duration_str):
     """Converts MM:SS string to milliseconds."""
-    parts = duration_str.split(':')
-    minutes = int(parts[0])
-    seconds = int(parts[1])
+    colon = duration_str.index(':')
+    minutes = int(duration_str[:colon])
+    seconds = int(duration_str[colon + 1:])
     return (minutes * 60 + seconds) * 1000
 
+def _nearest_silence_indices(silence_starts, targets):
+    """
+    For each target time, finds the index of the silence starting closest to it.
+    Both lists must be sorted; ties go to the earlier silence.
+    """
+    indices = []
+    idx = 0
+    last = len(silence_starts) - 1
+    for target in targets:
+        # Targets only move forward, so the search resumes where the previous one stopped
+        while idx < last and silence_starts[idx] < target:
+            idx += 1
+        if idx > 0 and target - silence_starts[idx - 1] <= silence_starts[idx] - target:
+            indices.append(idx - 1)
+        else:
+            indices.append(idx)
+    return indices
+
 def align_tracks_to_silences(tracks, silences, start_offset=0):
     """
     Aligns a list of tracks with a list of silences to find precise split points.
     Returns a list of tuples: (track_title, start_ms, end_ms)
     """
     aligned_tracks = []
-    cumulative_duration = 0
     last_split_point = start_offset
 
     # If there are no silences to align to, fall back to using cumulative durations
@@ -87,13 +106,17 @@ def align_tracks_to_silences(tracks, silences, start_offset=0):
             last_split_point = end_ms
         return aligned_tracks
 
+    # Expected split points for every track, resolved against the (time-ordered)
+    # silences in a single sweep
+    silence_starts = [s[0] for s in silences]
+    targets = [start_offset + c for c in itertools.accumulate(t['duration_ms'] for t in tracks)]
+    nearest = _nearest_silence_indices(silence_starts, targets)
+
     # --- Original 'best-fit' logic ---
-    for i, track in enumerate(tracks):
-        cumulative_duration += track['duration_ms']
-        
-        # Find the silence that is closest to our expected split point
+    for track, idx in zip(tracks, nearest):
+        # The silence closest to our expected split point
         # This is the 'best-fit' part of the algorithm
-        closest_silence = min(silences, key=lambda s: abs(s[0] - (start_offset + cumulative_duration)))
+        closest_silence = silences[idx]
         
         # The end of the track is the beginning of the closest silence
         split_point = closest_silence[0]
@@ -110,7 +133,7 @@ def align_tracks_to_silences(tracks, silences, start_offset=0):
     return aligned_tracks
 
 
-def main(input_audio, output_dir, min_silence_len, silence_thresh):
+def main(input_audio, output_dir, min_silence_len, silence_thresh, preloaded_album_data=None):
     artist, album_title = parse_artist_album_from_filename(input_audio)
     if not artist or not album_title:
         return
@@ -122,13 +145,17 @@ def main(input_audio, output_dir, min_silence_len, silence_thresh):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    album_data_path = os.path.join(output_dir, "album_data.json")
-    if not os.path.exists(album_data_path):
-        print(f"Error: '{album_data_path}' not found. Please run fetch_album_data.py first.", file=sys.stderr)
-        return
-
-    with open(album_data_path, 'r') as f:
-        ALBUM_DATA = json.load(f)
+    # main.py hands over the album data it just fetched, so only standalone runs read the file
+    if preloaded_album_data is not None:
+        ALBUM_DATA = preloaded_album_data
+    else:
+        album_data_path = os.path.join(output_dir, "album_data.json")
+        if not os.path.exists(album_data_path):
+            print(f"Error: '{album_data_path}' not found. Please run fetch_album_data.py first.", file=sys.stderr)
+            return
+
+        with open(album_data_path, 'rb') as f:
+            ALBUM_DATA = _loads(f.read())
     
     print(f"Starting intelligent track splitting for {input_audio}...")
     
@@ -141,8 +168,8 @@ def main(input_audio, output_dir, min_silence_len, silence_thresh):
         track['duration_ms'] = duration_to_ms(track['duration'])
 
     # 1. Detect all silences and the main side break
-    silence_intervals = detect_silence_intervals(input_audio, min_silence_len, silence_thresh)
-    side_break = find_side_break(silence_intervals)
+    silence_intervals, audio_duration_ms = detect_silence_intervals(input_audio, min_silence_len, silence_thresh)
+    side_break, side_a_silences, side_b_silences = find_side_break(silence_intervals)
     
     if not side_break:
         print("Could not identify a side break. Cannot perform intelligent splitting. Aborting.")
@@ -152,9 +179,6 @@ def main(input_audio, output_dir, min_silence_len, silence_thresh):
     side_a_track_count = album_info.get('side_a_tracks', len(album_info['tracks']) // 2)
     side_a_tracks = album_info['tracks'][:side_a_track_count]
     side_b_tracks = album_info['tracks'][side_a_track_count:]
-
-    side_a_silences = [s for s in silence_intervals if s[1] < side_break[0]]
-    side_b_silences = [s for s in silence_intervals if s[0] > side_break[1]]
     
     # 3. Align tracks for each side
     aligned_side_a = align_tracks_to_silences(side_a_tracks, side_a_silences, start_offset=0)
@@ -162,6 +186,11 @@ def main(input_audio, output_dir, min_silence_len, silence_thresh):
 
     all_aligned_tracks = aligned_side_a + aligned_side_b
 
+    # Cumulative-duration fallback can overshoot the end of the recording
+    if all_aligned_tracks and audio_duration_ms is not None:
+        last_track = all_aligned_tracks[-1]
+        last_track['end_ms'] = min(last_track['end_ms'], audio_duration_ms)
+
     print("\nAligned Tracks:")
     for i, track in enumerate(all_aligned_tracks):
         start_td = str(timedelta(milliseconds=track['start_ms'])).split('.')[0]
@@ -170,12 +199,23 @@ def main(input_audio, output_dir, min_silence_len, silence_thresh):
 
     # 4. Split and rename files
     print("\nSplitting and renaming tracks...")
+    split_jobs = []
     for i, track in enumerate(all_aligned_tracks):
+        # Two tracks snapped to the same silence leave one that ends before it starts;
+        # a single bad clause would fail the shared ffmpeg command for every track
+        if track['end_ms'] <= track['start_ms']:
+            print(f"Warning: Skipping track {i+1:02d} '{track['title']}': could not align it to a silence.")
+            continue
+
         # Sanitize filename
-        safe_title = "".join([c for c in track['title'] if c.isalpha() or c.isdigit() or c==' ']).rstrip()
+        safe_title = _UNSAFE_FILENAME_CHARS.sub('', track['title']).rstrip()
         output_filename = os.path.join(output_dir, f"{i+1:02d} - {safe_title}.mp3")
-        
-        split_audio_segment(input_audio, track['start_ms'], track['end_ms'], output_filename)
+        split_jobs.append((track['start_ms'], track['end_ms'], output_filename))
+
+    # One ffmpeg process reads the recording once and writes every track
+    if split_jobs and not split_audio_segments(input_audio, split_jobs, codec="copy"):
+        print("Error: Splitting the recording failed.", file=sys.stderr)
+        sys.exit(1)
 
     print("\nIntelligent track splitting complete.")
 
@@ -189,5 +229,8 @@ if __name__ == "__main__":
                         help="The dBFS value below which audio is considered silent (default: -40.0 dBFS).")
     
     args = parser.parse_args()
+
+    # Show split_audio's progress messages alongside this script's output
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
     
     main(args.input_audio, args.output_dir, args.min_silence_len, args.silence_thresh)
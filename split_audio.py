@@ -1,8 +1,139 @@
 import subprocess
 import os
 import argparse
+import concurrent.futures
+import array
+import collections
+import bisect
+import mmap
+import logging
+import shlex
+import shutil
+import sys
 
-def split_audio_segment(input_path, start_ms, end_ms, output_path):
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Resolved once, so parallel workers don't each search PATH when they launch ffmpeg
+_FFMPEG_PATH = shutil.which("ffmpeg") or "ffmpeg"
+_FFPROBE_PATH = shutil.which("ffprobe") or "ffprobe"
+
+# Lets CPython launch ffmpeg with posix_spawn() instead of fork() + exec(), which
+# doesn't copy the parent's page tables. That fast path needs an executable path with
+# a directory (hence the resolved paths above), no preexec_fn/cwd/new session, and
+# close_fds=False on Python < 3.13. Leaving descriptors open there is safe because
+# Python creates them non-inheritable (PEP 446), so children only get their own pipes;
+# 3.13+ can close them and still use posix_spawn.
+_SPAWN_OPTIONS = {"close_fds": sys.version_info >= (3, 13), "env": None}
+
+# Options for every ffmpeg run. -nostdin stops ffmpeg from reading the terminal,
+# which matters when several run in parallel.
+_FFMPEG_OPTIONS = ["-nostdin", "-hide_banner", "-nostats", "-loglevel", "error"]
+
+# Options placed before each -i. Small probe/analyze limits cut ffmpeg's startup time
+# for stream copies; set SPLIT_AUDIO_INPUT_OPTIONS to override them (e.g. to "") for
+# formats that need a longer probe to be detected. -fflags +fastseek is deliberately
+# not used: it seeks MP3s by the Xing TOC or byte rate, which misplaces VBR cuts.
+_FFMPEG_INPUT_OPTIONS = shlex.split(os.environ.get(
+    "SPLIT_AUDIO_INPUT_OPTIONS", "-probesize 32k -analyzeduration 0"))
+
+def ms_to_ts(ms):
+    """Converts integer milliseconds to an exact HH:MM:SS.mmm ffmpeg timestamp."""
+    if ms < 0:
+        raise ValueError(f"Negative time: {ms} ms")
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{ms:03d}"
+
+def warm_up_ffmpeg():
+    """
+    Runs 'ffmpeg -version' once so the binary and its shared libraries are
+    paged in before several splits launch it at the same time.
+    """
+    try:
+        subprocess.run([_FFMPEG_PATH, "-version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       **_SPAWN_OPTIONS)
+    except OSError:
+        pass  # The real split reports a missing ffmpeg
+
+def _run_ffmpeg(command):
+    """
+    Runs an ffmpeg command, keeping its stderr as raw bytes.
+
+    Returns:
+        str: None if ffmpeg succeeded, otherwise its decoded error output (or
+            the launch error if ffmpeg couldn't be started).
+    """
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, **_SPAWN_OPTIONS)
+    except OSError as e:  # e.g. ffmpeg isn't installed
+        return str(e)
+    _, stderr = process.communicate()
+
+    # The log is only worth decoding when something went wrong
+    if process.returncode != 0:
+        return stderr.decode('utf-8', errors='replace')
+    return None
+
+# How far a segment start may be from a keyframe and still be stream-copied
+KEYFRAME_TOLERANCE_MS = 50
+
+def get_keyframes(input_path):
+    """
+    Lists the keyframe times of an audio file's first audio stream with ffprobe.
+
+    Returns:
+        array: Sorted keyframe times in milliseconds, or None if ffprobe failed.
+    """
+    command = [
+        _FFPROBE_PATH,
+        "-v", "error",
+        "-select_streams", "a:0",
+        "-show_entries", "packet=pts_time,flags",
+        "-of", "csv=p=0",
+        input_path
+    ]
+    try:
+        process = subprocess.run(command, capture_output=True, **_SPAWN_OPTIONS)
+    except OSError:  # e.g. ffprobe isn't installed
+        process = None
+    if process is None or process.returncode != 0:
+        logger.warning("Could not read keyframes of %s; stream copying every segment", input_path)
+        return None
+
+    keyframes = array.array('d')
+    for line in process.stdout.splitlines():
+        pts_time, _, flags = line.partition(b",")
+        if b"K" in flags and pts_time not in (b"", b"N/A"):
+            keyframes.append(float(pts_time) * 1000)
+    return array.array('d', sorted(keyframes))
+
+def _codec_options(codec, start_ms, keyframes):
+    """
+    Returns the ffmpeg codec options for a segment. A stream copy is only kept
+    when the segment starts on a keyframe; otherwise the copy would begin at the
+    previous keyframe, so the segment is re-encoded with the output format's
+    default encoder instead.
+    """
+    if codec != "copy" or _on_keyframe(start_ms, keyframes):
+        return ["-c", codec]
+    return []
+
+def _on_keyframe(time_ms, keyframes):
+    """Returns True if time_ms is within KEYFRAME_TOLERANCE_MS of a keyframe (or keyframes is unknown)."""
+    if not keyframes:
+        return True
+
+    i = bisect.bisect_left(keyframes, time_ms)
+    nearest = min(abs(keyframes[j] - time_ms) for j in (i - 1, i) if 0 <= j < len(keyframes))
+    return nearest <= KEYFRAME_TOLERANCE_MS
+
+def split_audio_segment(input_path, start_ms, end_ms, output_path, codec="copy", keyframes=None):
     """
     Splits an audio file into a segment using ffmpeg.
 
@@ -11,55 +142,610 @@ def split_audio_segment(input_path, start_ms, end_ms, output_path):
         start_ms (int): Start time of the segment in milliseconds.
         end_ms (int): End time of the segment in milliseconds.
         output_path (str): Path for the output segment file.
+        codec (str): Audio codec for the output. The default "copy" cuts the
+            stream without re-encoding.
+        keyframes (array): The input's get_keyframes() result. If given, a
+            segment that doesn't start on a keyframe is re-encoded instead of copied.
 
     Returns:
         bool: True if splitting was successful, False otherwise.
     """
-    start_sec = start_ms / 1000.0
-    end_sec = end_ms / 1000.0
-    duration_sec = end_sec - start_sec
+    if end_ms <= start_ms:
+        logger.error("Segment for %s must end after it starts (%d ms to %d ms)", output_path, start_ms, end_ms)
+        return False
 
     # Ensure output directory exists
     output_dir = os.path.dirname(output_path)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
 
+    # -ss before -i seeks in the input instead of demuxing up to the start point;
+    # -t is then relative to the seek point.
     command = [
-        "ffmpeg",
+        _FFMPEG_PATH,
+        *_FFMPEG_OPTIONS,
+        *_FFMPEG_INPUT_OPTIONS,
+        "-ss", ms_to_ts(start_ms),
         "-i", input_path,
-        "-ss", str(start_sec),
-        "-to", str(end_sec),
-        "-c", "copy",
+        "-t", ms_to_ts(end_ms - start_ms),
+        *_codec_options(codec, start_ms, keyframes),
+        "-avoid_negative_ts", "make_zero",
         output_path
     ]
 
-    print(f"Splitting audio from {start_sec:.2f}s to {end_sec:.2f}s to {output_path}")
-    process = subprocess.run(command, capture_output=True, text=True, encoding='utf-8', errors='replace')
+    logger.info("Splitting audio from %d.%03ds to %d.%03ds to %s",
+                start_ms // 1000, start_ms % 1000, end_ms // 1000, end_ms % 1000, output_path)
+    error = _run_ffmpeg(command)
 
-    if process.returncode != 0:
-        print(f"ffmpeg split command failed for {output_path} with error:\n{process.stderr}")
+    if error is not None:
+        logger.error("ffmpeg split command failed for %s with error:\n%s", output_path, error)
         return False
     else:
-        print(f"Successfully split audio to {output_path}")
+        logger.info("Successfully split audio to %s", output_path)
         return True
 
+def _max_segments_per_process():
+    """
+    Returns how many segments one ffmpeg process can take before running out of
+    file descriptors: each segment opens the input once and its output once.
+    """
+    soft_limit = 512  # Windows' default C runtime limit
+    if resource is not None:
+        soft_limit, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft_limit == resource.RLIM_INFINITY:
+            soft_limit = 4096
+    # Leave headroom for stdio, libraries and ffmpeg's own files
+    return max(1, (soft_limit - 32) // 2)
+
+def split_audio_segments(input_path, segments, codec="copy", keyframes=None):
+    """
+    Splits an audio file into several segments with a single ffmpeg process
+    (or a few, if there are more segments than one process can have files open).
+
+    Each segment gets its own input clause with -ss before -i, so ffmpeg seeks
+    straight to it instead of demuxing from the start of the file, and its own
+    output clause, so gaps between segments are simply left out.
+
+    Args:
+        input_path (str): Path to the input audio file.
+        segments (list): (start_ms, end_ms, output_path) tuples.
+        codec (str): Audio codec for the outputs. The default "copy" cuts the
+            stream without re-encoding.
+        keyframes (array): The input's get_keyframes() result. If given, segments
+            that don't start on a keyframe are re-encoded instead of copied.
+
+    Returns:
+        bool: True if splitting was successful, False otherwise.
+    """
+    # One bad clause would fail the whole command, so check every segment first
+    invalid = [output_path for start_ms, end_ms, output_path in segments if end_ms <= start_ms]
+    if invalid:
+        logger.error("Segments must end after they start: %s", ", ".join(invalid))
+        return False
+
+    # Very long lists are split over several runs to stay within the open file limit
+    max_segments = _max_segments_per_process()
+    if len(segments) > max_segments:
+        results = [split_audio_segments(input_path, segments[i:i + max_segments], codec, keyframes)
+                   for i in range(0, len(segments), max_segments)]
+        return all(results)
+
+    inputs = [_FFMPEG_PATH, *_FFMPEG_OPTIONS]
+    outputs = []
+
+    # Segments usually share one directory, so create each distinct directory once
+    for output_dir in {os.path.dirname(output_path) for _, _, output_path in segments}:
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+    for i, (start_ms, end_ms, output_path) in enumerate(segments):
+        # -t is relative to the input seek point
+        inputs += [
+            *_FFMPEG_INPUT_OPTIONS,
+            "-ss", ms_to_ts(start_ms),
+            "-t", ms_to_ts(end_ms - start_ms),
+            "-i", input_path
+        ]
+        # Audio only, as in split_contiguous_segments: cover art would be re-encoded
+        # whenever the segment can't be stream copied
+        outputs += [
+            "-map", f"{i}:a",
+            *_codec_options(codec, start_ms, keyframes),
+            "-avoid_negative_ts", "make_zero",
+            output_path
+        ]
+
+    command = inputs + outputs
+
+    logger.info("Splitting audio into %d segments", len(segments))
+    error = _run_ffmpeg(command)
+
+    if error is not None:
+        logger.error("ffmpeg split command failed with error:\n%s", error)
+        return False
+    else:
+        for _, _, output_path in segments:
+            logger.info("Successfully split audio to %s", output_path)
+        return True
+
+def is_contiguous(segments):
+    """Returns True if there are several segments and each one starts where the previous one ends."""
+    return len(segments) > 1 and all(
+        segments[i + 1][0] == segments[i][1] for i in range(len(segments) - 1))
+
+def split_contiguous_segments(input_path, segments, codec="copy"):
+    """
+    Splits back-to-back segments with ffmpeg's segment muxer, so one input and
+    one output clause cover every cut instead of an input/output pair per segment.
+
+    The muxer can only number its outputs, so they are written under temporary
+    names in the outputs' directory and renamed once ffmpeg has finished.
+
+    Args:
+        input_path (str): Path to the input audio file.
+        segments (list): (start_ms, end_ms, output_path) tuples for which
+            is_contiguous() is True. All outputs must share one directory
+            and one extension.
+        codec (str): Audio codec for the outputs.
+
+    Returns:
+        bool: True if splitting was successful, False otherwise.
+    """
+    first_start = segments[0][0]
+    output_paths = [output_path for _, _, output_path in segments]
+    for output_dir in {os.path.dirname(output_path) for output_path in output_paths}:
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+    extension = os.path.splitext(output_paths[0])[1]
+    # '%' in the directory would be read as a format directive, by ffmpeg and by pattern % i
+    pattern = os.path.join(os.path.dirname(output_paths[0]).replace("%", "%%"),
+                           f".split_audio_{os.getpid()}_%03d{extension.replace('%', '%%')}")
+    temp_paths = [pattern % i for i in range(len(segments))]
+
+    # Cut times are relative to the input seek point
+    command = [
+        _FFMPEG_PATH, *_FFMPEG_OPTIONS,
+        *_FFMPEG_INPUT_OPTIONS,
+        "-ss", ms_to_ts(first_start),
+        "-t", ms_to_ts(segments[-1][1] - first_start),
+        "-i", input_path,
+        # Audio only: an attached cover picture would only land in the first segment
+        "-map", "0:a",
+        "-c", codec,
+        "-f", "segment",
+        "-segment_times", ",".join(ms_to_ts(end_ms - first_start) for _, end_ms, _ in segments[:-1]),
+        "-reset_timestamps", "1",
+        pattern
+    ]
+
+    logger.info("Splitting audio into %d contiguous segments", len(segments))
+    error = _run_ffmpeg(command)
+    if error is None and not all(os.path.exists(temp_path) for temp_path in temp_paths):
+        error = f"expected {len(segments)} segments from the segment muxer"
+
+    if error is not None:
+        logger.error("ffmpeg segment command failed with error:\n%s", error)
+        for temp_path in temp_paths:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return False
+
+    for temp_path, output_path in zip(temp_paths, output_paths):
+        os.replace(temp_path, output_path)
+        logger.info("Successfully split audio to %s", output_path)
+    return True
+
+# MP3 frame header tables, indexed by the header's version bits
+# (0 = MPEG 2.5, 2 = MPEG 2, 3 = MPEG 1) and layer bits (1 = III, 2 = II, 3 = I).
+_MP3_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+_MP3_BITRATES = {
+    (3, 3): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (3, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (3, 1): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 3): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 1): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+def _parse_mp3_frame_header(data, pos):
+    """
+    Parses the MP3 frame header at data[pos].
+
+    Returns:
+        tuple: (frame_length_bytes, frame_duration_ms), or None if there is no valid header at pos.
+    """
+    if pos + 4 > len(data) or data[pos] != 0xFF or data[pos + 1] & 0xE0 != 0xE0:
+        return None
+
+    version = (data[pos + 1] >> 3) & 0x03
+    layer = (data[pos + 1] >> 1) & 0x03
+    bitrate_index = data[pos + 2] >> 4
+    sample_rate_index = (data[pos + 2] >> 2) & 0x03
+    padding = (data[pos + 2] >> 1) & 0x01
+
+    if version == 1 or layer == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    # MPEG 2.5 shares MPEG 2's bitrate table
+    bitrate = _MP3_BITRATES[(3 if version == 3 else 2, layer)][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][sample_rate_index]
+
+    if layer == 3:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 1152 if layer == 2 or version == 3 else 576
+        length = samples // 8 * bitrate // sample_rate + padding
+
+    return length, samples * 1000.0 / sample_rate
+
+def _mp3_audio_start(data):
+    """Returns the offset of the first byte after a leading ID3v2 tag, if there is one."""
+    if len(data) >= 10 and data[:3] == b"ID3":
+        # The tag size is a 28-bit "syncsafe" integer; a footer adds another 10 bytes
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        return 10 + size + (10 if data[5] & 0x10 else 0)
+    return 0
+
+def _is_vbr_header_frame(data, pos):
+    """
+    Returns True if the Layer III frame at data[pos] is a Xing/Info or VBRI
+    header. Encoders put one in place of the first frame to carry the frame
+    count and seek table; it holds no audio.
+    """
+    mpeg1 = (data[pos + 1] >> 3) & 0x03 == 3
+    mono = data[pos + 3] >> 6 == 3
+    # The Xing tag follows the side info, whose size depends on version and channels;
+    # the VBRI tag is always 32 bytes after the header
+    side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+    return (data[pos + 4 + side_info:pos + 8 + side_info] in (b"Xing", b"Info")
+            or data[pos + 36:pos + 40] == b"VBRI")
+
+def _copy_byte_range(in_fd, out_fd, offset, count):
+    """
+    Copies count bytes starting at offset from in_fd to the current position of
+    out_fd inside the kernel, with copy_file_range(2) or sendfile(2).
+
+    Returns:
+        int: The number of bytes copied, which is less than count if neither
+            call is available or the kernel refused the copy.
+    """
+    copied = 0
+
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while copied < count:
+                n = os.copy_file_range(in_fd, out_fd, count - copied, offset_src=offset + copied)
+                if n == 0:
+                    break
+                copied += n
+        except OSError:
+            pass  # e.g. not supported between these filesystems; try sendfile for the rest
+
+    if copied < count and hasattr(os, 'sendfile'):
+        try:
+            while copied < count:
+                n = os.sendfile(out_fd, in_fd, offset + copied, count - copied)
+                if n == 0:
+                    break
+                copied += n
+        except OSError:
+            pass  # e.g. macOS only sends to sockets
+
+    return copied
+
+def build_mp3_index(input_path):
+    """
+    Walks the frame headers of an MP3 file once to index where each frame starts.
+    A leading Xing/Info or VBRI header frame and a trailing ID3v1 tag are left out.
+
+    Returns:
+        tuple: (byte_offsets, start_ms) arrays with one entry per audio frame, plus
+            a final entry for the end of the audio and the total duration.
+    """
+    byte_offsets = array.array('q')
+    start_ms = array.array('d')
+
+    with open(input_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return byte_offsets, start_ms
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            pos = _mp3_audio_start(data)
+            elapsed_ms = 0.0
+
+            # A 128-byte ID3v1 tag may follow the last frame
+            if size - pos >= 128 and data[size - 128:size - 125] == b"TAG":
+                size -= 128
+
+            # Until a frame is confirmed by the one after it, a 0xFF 0xEx pair may just be data
+            synced = False
+            while pos < size:
+                header = _parse_mp3_frame_header(data, pos)
+                if header is not None and not synced:
+                    next_pos = pos + header[0]
+                    if next_pos != size and (next_pos > size or _parse_mp3_frame_header(data, next_pos) is None):
+                        header = None
+                if header is None:
+                    # Not a frame; resynchronise on the next possible sync byte
+                    synced = False
+                    pos = data.find(b"\xff", pos + 1, size)
+                    if pos == -1:
+                        break
+                    continue
+
+                synced = True
+                length, duration_ms = header
+                if not byte_offsets and (data[pos + 1] >> 1) & 0x03 == 1 and _is_vbr_header_frame(data, pos):
+                    # Copying it into a segment would give that segment the whole file's length
+                    pos += length
+                    continue
+
+                byte_offsets.append(pos)
+                start_ms.append(elapsed_ms)
+
+                pos += length
+                elapsed_ms += duration_ms
+
+    byte_offsets.append(size)
+    start_ms.append(elapsed_ms)
+    return byte_offsets, start_ms
+
+def split_mp3_fast(input_path, start_ms, end_ms, output_path, index=None):
+    """
+    Splits an MP3 file into a segment by copying whole frames, without ffmpeg.
+
+    The bytes from the first frame starting at or after start_ms up to the
+    first frame starting at or after end_ms are copied as-is.
+
+    Args:
+        input_path (str): Path to the input MP3 file.
+        start_ms (int): Start time of the segment in milliseconds.
+        end_ms (int): End time of the segment in milliseconds.
+        output_path (str): Path for the output segment file.
+        index (tuple): The file's build_mp3_index() result. Pass it when cutting
+            several segments from the same file so it is only scanned once.
+
+    Returns:
+        bool: True if splitting was successful, False otherwise.
+    """
+    if index is None:
+        index = build_mp3_index(input_path)
+    byte_offsets, frame_start_ms = index
+
+    # The last entry marks the end of the file rather than a frame
+    frame_count = len(frame_start_ms) - 1
+    first = bisect.bisect_left(frame_start_ms, start_ms, 0, max(frame_count, 0))
+    if first >= frame_count:
+        logger.warning("Could not find MP3 frames for %dms in %s", start_ms, input_path)
+        return False
+    last = bisect.bisect_left(frame_start_ms, end_ms, first, frame_count)
+    if last == first:
+        logger.warning("No MP3 frame starts between %dms and %dms in %s", start_ms, end_ms, input_path)
+        return False
+    start_byte = byte_offsets[first]
+    end_byte = byte_offsets[last]
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    logger.info("Splitting audio from %d.%03ds to %d.%03ds to %s",
+                start_ms // 1000, start_ms % 1000, end_ms // 1000, end_ms % 1000, output_path)
+    with open(input_path, 'rb') as f:
+        out_fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            # The output size is known exactly, so reserve it in one go rather than
+            # letting the file grow extent by extent
+            if hasattr(os, 'posix_fallocate') and end_byte > start_byte:
+                try:
+                    os.posix_fallocate(out_fd, 0, end_byte - start_byte)
+                except OSError:
+                    pass  # Not supported by this filesystem
+
+            # Keep the bytes in the kernel where possible; copy whatever is left through userspace
+            copied = _copy_byte_range(f.fileno(), out_fd, start_byte, end_byte - start_byte)
+            f.seek(start_byte + copied)
+            remaining = end_byte - start_byte - copied
+            while remaining > 0:
+                chunk = f.read(min(remaining, 1024 * 1024))
+                if not chunk:
+                    break
+                with memoryview(chunk) as view:
+                    written = 0
+                    while written < len(chunk):
+                        written += os.write(out_fd, view[written:])
+                remaining -= len(chunk)
+
+            if remaining:
+                # The input shrank under us; drop the preallocated tail rather than leave zeros
+                os.ftruncate(out_fd, end_byte - start_byte - remaining)
+        finally:
+            os.close(out_fd)
+
+    if remaining:
+        logger.error("Input ended %d bytes early while copying to %s", remaining, output_path)
+        return False
+
+    logger.info("Successfully split audio to %s", output_path)
+    return True
+
+def parse_segments(segment_strs):
+    """
+    Parses and validates 'start_ms,end_ms,filename' segment strings up front.
+
+    Args:
+        segment_strs (iterable): The segment strings.
+
+    Returns:
+        tuple: (starts, ends, names) parallel sequences, with start and end times
+            in milliseconds as integer arrays.
+
+    Raises:
+        ValueError: Describing every invalid segment, if there are any.
+    """
+    starts = array.array('q')
+    ends = array.array('q')
+    names = []
+    errors = []
+
+    for segment_str in segment_strs:
+        parts = segment_str.split(',', 2)
+        try:
+            if len(parts) != 3 or not parts[2]:
+                raise ValueError
+            start_ms, end_ms = int(parts[0]), int(parts[1])
+        except ValueError:
+            errors.append(f"Invalid segment format: {segment_str}. Expected 'start_ms,end_ms,filename'")
+            continue
+
+        if not 0 <= start_ms < end_ms:
+            errors.append(f"Invalid segment times: {segment_str}. Expected 0 <= start_ms < end_ms")
+        starts.append(start_ms)
+        ends.append(end_ms)
+        names.append(parts[2])
+
+    duplicates = sorted(name for name, count in collections.Counter(names).items() if count > 1)
+    if duplicates:
+        errors.append(f"Duplicate segment filenames: {', '.join(duplicates)}")
+
+    if errors:
+        raise ValueError("\n".join(errors))
+    return starts, ends, names
+
+def _storage_kind(path):
+    """
+    Guesses the kind of disk a file lives on from Linux sysfs.
+
+    Returns:
+        str: "hdd", "ssd" or "nvme", or None if it can't be determined.
+    """
+    try:
+        st = os.stat(path)
+        device_dir = os.path.realpath(f"/sys/dev/block/{os.major(st.st_dev)}:{os.minor(st.st_dev)}")
+        # Partitions keep their queue settings on the parent disk
+        if os.path.exists(os.path.join(device_dir, "partition")):
+            device_dir = os.path.dirname(device_dir)
+        with open(os.path.join(device_dir, "queue", "rotational")) as f:
+            rotational = f.read().strip() == "1"
+    except (OSError, AttributeError):
+        return None
+
+    if rotational:
+        return "hdd"
+    return "nvme" if os.path.basename(device_dir).startswith("nvme") else "ssd"
+
+def default_jobs(path, kernel_copy=False):
+    """
+    Picks a default number of parallel splits for a file.
+
+    Stream copies are sequential reads and writes, so they are limited by the
+    disk rather than the CPU: a spinning disk only gets 2 jobs, an SSD up to 8
+    and NVMe up to 16, never more than the CPU count. kernel_copy doubles that
+    for the MP3 fast path, which copies inside the kernel and starts no processes.
+    """
+    cpus = os.cpu_count() or 1
+    kind = _storage_kind(path)
+    if kind == "hdd":
+        jobs = 2
+    elif kind == "nvme":
+        jobs = min(16, cpus)
+    else:
+        jobs = min(8, cpus)
+    return jobs * 2 if kernel_copy else jobs
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Split an audio file into segments using ffmpeg.")
     parser.add_argument("input_file", type=str, help="Path to the input audio file (e.g., MP3).")
     parser.add_argument("output_dir", type=str, help="Directory to save the split audio files.")
-    parser.add_argument("--segments", type=str, nargs='+', required=True,
-                        help="List of segments as 'start_ms,end_ms,filename'. "
-                             "Example: '0,60000,track1.mp3' '60000,120000,track2.mp3'")
+    segments_group = parser.add_mutually_exclusive_group(required=True)
+    segments_group.add_argument("--segments", type=str, nargs='+',
+                                help="List of segments as 'start_ms,end_ms,filename'. "
+                                     "Example: '0,60000,track1.mp3' '60000,120000,track2.mp3'")
+    segments_group.add_argument("--segments-file", type=str,
+                                help="File with one 'start_ms,end_ms,filename' segment per line, "
+                                     "or '-' to read them from stdin. Avoids command-line length "
+                                     "limits for long segment lists.")
+    parser.add_argument("--jobs", type=int,
+                        help="Number of ffmpeg processes to run in parallel, each handling a batch "
+                             "of segments; for MP3 input, the number of segments copied in parallel. "
+                             "Stream copies are limited by the disk rather than the CPU, so the default "
+                             "depends on where the input lives: 2 on a spinning disk, up to 8 on an "
+                             "SSD and up to 16 on NVMe (capped at the CPU count), doubled for MP3 input.")
 
     args = parser.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        parser.error(f"--jobs must be at least 1, not {args.jobs}")
 
-    for segment_str in args.segments:
-        parts = segment_str.split(',')
-        if len(parts) == 3:
-            start_ms = int(parts[0])
-            end_ms = int(parts[1])
-            filename = parts[2]
-            output_path = os.path.join(args.output_dir, filename)
-            split_audio_segment(args.input_file, start_ms, end_ms, output_path)
+    # logging serialises messages from the worker threads, so their lines don't interleave
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(threadName)s %(message)s')
+
+    # Every segment is checked before any splitting starts
+    try:
+        if args.segments_file is not None:
+            segments_file = sys.stdin if args.segments_file == '-' else open(args.segments_file, encoding='utf-8')
+            with segments_file:
+                starts, ends, names = parse_segments(line.strip() for line in segments_file if line.strip())
         else:
-            print(f"Invalid segment format: {segment_str}. Expected 'start_ms,end_ms,filename'")
+            starts, ends, names = parse_segments(args.segments)
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+
+    segments = [(starts[i], ends[i], os.path.join(args.output_dir, names[i])) for i in range(len(names))]
+
+    # Create the output directory up front so parallel workers don't race to create it
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    is_mp3 = args.input_file.lower().endswith('.mp3')
+    if args.jobs is None:
+        args.jobs = default_jobs(args.input_file, kernel_copy=is_mp3)
+
+    if is_mp3:
+        # MP3 segments are cut by copying whole frames, so no ffmpeg process is needed at all.
+        # The frame index is built once and shared; fall back to ffmpeg for a segment if the
+        # frames can't be read.
+        mp3_index = build_mp3_index(args.input_file)
+
+        def split_mp3_segment(segment):
+            try:
+                if split_mp3_fast(args.input_file, *segment, index=mp3_index):
+                    return True
+            except OSError as e:
+                logger.error("Copying MP3 frames to %s failed: %s", segment[2], e)
+            return split_audio_segment(args.input_file, *segment)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=args.jobs) as executor:
+            failed = sum(1 for ok in executor.map(split_mp3_segment, segments) if not ok)
+    else:
+        # Probe keyframes once, so only segments that can't be cut cleanly are re-encoded
+        keyframes = get_keyframes(args.input_file)
+        warm_up_ffmpeg()
+
+        # Back-to-back segments that can all be stream copied are cut in one pass by the segment muxer
+        if (is_contiguous(segments)
+                and len({os.path.dirname(output_path) for _, _, output_path in segments}) == 1
+                and len({os.path.splitext(name)[1].lower() for name in names}) == 1
+                and all(_on_keyframe(start_ms, keyframes) for start_ms in starts)):
+            failed = 0 if split_contiguous_segments(args.input_file, segments) else len(segments)
+        else:
+            # Rather than one ffmpeg process per segment, each worker runs a single ffmpeg
+            # process over a contiguous batch of segments. With --jobs 1 that is one process for everything.
+            jobs = max(1, min(args.jobs, len(segments)))
+            batch_size = -(-len(segments) // jobs) if segments else 1
+            batches = [segments[i:i + batch_size] for i in range(0, len(segments), batch_size)]
+
+            # ffmpeg does the work in a child process, so threads are enough to run batches in parallel
+            with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+                futures = {executor.submit(split_audio_segments, args.input_file, batch, keyframes=keyframes): batch
+                           for batch in batches}
+                failed = sum(len(batch) for future, batch in futures.items() if not future.result())
+
+    if failed:
+        logger.error("%d of %d segments failed to split.", failed, len(segments))
+        sys.exit(1)
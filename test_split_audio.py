@@ -0,0 +1,99 @@
+import os
+import random
+import tempfile
+import unittest
+
+from split_audio import build_mp3_index, split_mp3_fast
+
+# MPEG 1 Layer III, 128 kbps, 44.1 kHz, no padding: 417-byte frames of 1152 samples
+FRAME_HEADER_STEREO = b"\xff\xfb\x90\x00"
+FRAME_HEADER_MONO = b"\xff\xfb\x90\xc0"
+FRAME_LENGTH = 417
+FRAME_MS = 1152 * 1000.0 / 44100
+
+
+def audio_frame(fill):
+    return FRAME_HEADER_STEREO + bytes([fill]) * (FRAME_LENGTH - 4)
+
+
+def xing_frame(header=FRAME_HEADER_STEREO, side_info=32, tag=b"Xing"):
+    frame = header + bytes(side_info) + tag
+    return frame + bytes(FRAME_LENGTH - len(frame))
+
+
+def id3v2_tag(body_size=20):
+    # Syncsafe size; body_size < 128 fits in the last byte
+    return b"ID3\x03\x00\x00\x00\x00\x00" + bytes([body_size]) + bytes(body_size)
+
+
+# An ID3v1 tag whose text happens to contain a frame sync
+ID3V1_TAG = b"TAG" + FRAME_HEADER_STEREO + bytes(121)
+
+
+class Mp3IndexTest(unittest.TestCase):
+
+    def write_mp3(self, data):
+        fd, path = tempfile.mkstemp(suffix=".mp3")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_plain_frames(self):
+        path = self.write_mp3(b"".join(audio_frame(i) for i in range(3)))
+        offsets, start_ms = build_mp3_index(path)
+        self.assertEqual(list(offsets), [0, 417, 834, 1251])
+        self.assertEqual(list(start_ms), [0.0, FRAME_MS, 2 * FRAME_MS, 3 * FRAME_MS])
+
+    def test_tags_and_xing_header_are_skipped(self):
+        id3 = id3v2_tag()
+        frames = [audio_frame(i) for i in range(4)]
+        path = self.write_mp3(id3 + xing_frame() + b"".join(frames) + ID3V1_TAG)
+
+        offsets, start_ms = build_mp3_index(path)
+        audio_start = len(id3) + FRAME_LENGTH
+        self.assertEqual(list(offsets), [audio_start + i * FRAME_LENGTH for i in range(5)])
+        self.assertEqual(start_ms[0], 0.0)
+        self.assertAlmostEqual(start_ms[-1], 4 * FRAME_MS)
+
+    def test_info_and_vbri_headers_are_skipped(self):
+        for header in (xing_frame(FRAME_HEADER_MONO, side_info=17, tag=b"Info"),
+                       xing_frame(side_info=32, tag=b"VBRI")):
+            path = self.write_mp3(header + audio_frame(1) + audio_frame(2))
+            offsets, _ = build_mp3_index(path)
+            self.assertEqual(list(offsets), [FRAME_LENGTH, 2 * FRAME_LENGTH, 3 * FRAME_LENGTH])
+
+    def test_random_bytes_are_not_frames(self):
+        data = random.Random(0).randbytes(64 * 1024)
+        path = self.write_mp3(data)
+        offsets, _ = build_mp3_index(path)
+        self.assertEqual(list(offsets), [len(data)])
+
+    def test_split_shorter_than_a_frame_fails(self):
+        path = self.write_mp3(b"".join(audio_frame(i) for i in range(3)))
+        output_path = os.path.join(tempfile.mkdtemp(), "segment.mp3")
+        self.addCleanup(os.rmdir, os.path.dirname(output_path))
+        self.assertFalse(split_mp3_fast(path, 20, 25, output_path))
+        self.assertFalse(os.path.exists(output_path))
+
+    def test_split_copies_whole_audio_frames(self):
+        frames = [audio_frame(i) for i in range(4)]
+        path = self.write_mp3(id3v2_tag() + xing_frame() + b"".join(frames) + ID3V1_TAG)
+        output_dir = tempfile.mkdtemp()
+        output_path = os.path.join(output_dir, "segment.mp3")
+        self.addCleanup(os.rmdir, output_dir)
+        self.addCleanup(os.remove, output_path)
+
+        # Frames 1 and 2 start at ~26 ms and ~52 ms; frame 3 starts at ~78 ms
+        self.assertTrue(split_mp3_fast(path, 20, 70, output_path))
+        with open(output_path, "rb") as f:
+            self.assertEqual(f.read(), frames[1] + frames[2])
+
+        # The last segment stops before the ID3v1 tag
+        self.assertTrue(split_mp3_fast(path, 70, 1000, output_path))
+        with open(output_path, "rb") as f:
+            self.assertEqual(f.read(), frames[3])
+
+
+if __name__ == "__main__":
+    unittest.main()